@@ -1,207 +1,515 @@
 import logging
 import asyncio
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, ChatMember
+import atexit
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.constants import ParseMode
+from telegram.error import BadRequest
 from telegram.ext import Application, MessageHandler, CallbackQueryHandler, filters, ContextTypes
 import httpx
+import orjson
 from dotenv import load_dotenv
 import os
-import base58
-from datetime import datetime, timezone
-import html
+import random
+import sqlite3
+import time
+import re
 from collections import defaultdict
+from dataclasses import dataclass, replace
+from functools import lru_cache, partial
+from cachetools import TLRUCache, TTLCache
 
 load_dotenv()
 
-# Enable logging
-logging.basicConfig(
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    level=logging.INFO
-)
+# Enable logging; records are handed to a background thread that does the writing,
+# so a burst of errors never blocks the event loop on stderr
+log_queue = queue.SimpleQueue()
+log_handler = logging.StreamHandler()
+log_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+log_listener = QueueListener(log_queue, log_handler)
+logging.getLogger().addHandler(QueueHandler(log_queue))
+logging.getLogger().setLevel(logging.INFO)
+log_listener.start()
+atexit.register(log_listener.stop)
 
 logger = logging.getLogger(__name__)
 
-DEXSCREENER_API_URL = "https://api.dexscreener.com/latest/dex/search/?q="
+# Token lookup endpoint; returns fewer pairs than the fuzzy /search/?q= endpoint
+DEXSCREENER_API_URL = "https://api.dexscreener.com/latest/dex/tokens/"
 PUMPFUN_API_URL = "https://frontend-api.pump.fun/coins/"
 
-# Dictionary to store tracked contracts and their initial market caps
-tracked_contracts = defaultdict(lambda: {"initial_market_cap": None, "last_alerted_cap": None, "pin_message_id": None, "chat_id": None})
+# Maximum number of comma-separated addresses the Dexscreener tokens endpoint accepts
+DEXSCREENER_BATCH_SIZE = 30
+
+# Fixed-alphabet address fragments; the compiled patterns below are anchored so a match never backtracks
+ETHEREUM_ADDRESS_PATTERN = r"0x[0-9a-fA-F]{40}"
+SOLANA_ADDRESS_PATTERN = r"[1-9A-HJ-NP-Za-km-z]{32,44}"
+
+SOLANA_ADDRESS_RE = re.compile(rf"\A{SOLANA_ADDRESS_PATTERN}\Z")
+
+# Message filter: a contract address and nothing else apart from surrounding whitespace
+CONTRACT_MESSAGE_RE = re.compile(rf"\A\s*(?:{ETHEREUM_ADDRESS_PATTERN}|{SOLANA_ADDRESS_PATTERN})\s*\Z")
+
+DEXTOOLS_URL_TEMPLATE = "https://www.dextools.io/app/{chain_slug}/pair-explorer/{contract_address}"
+SOLSCAN_URL_TEMPLATE = "https://solscan.io/token/{contract_address}"
+
+# Token card sent for Dexscreener results; filled with str.format_map
+DEXSCREENER_MESSAGE_TEMPLATE = (
+    "<b>Network:</b> {chain_name}\n"
+    "\n"
+    "<b>{name}</b> | <b>${symbol}</b>\n\n"
+    "<b>💲 Price (USD):</b> ${price}\n"
+    "<b>💰 MC (USD):</b> ${market_cap}\n"
+    "<b>💧 Liq (USD):</b> ${liquidity}\n"
+    "<b>🕒 Age:</b> {age}\n"
+    "\n"
+    "<b>🔄 B/S: 5m:</b> {buys_5m}/{sells_5m} | <b>1h:</b> {buys_1h}/{sells_1h} | <b>24h:</b> {buys_24h}/{sells_24h}\n"
+    "<b>📊 Volume (USD): 5m:</b> ${volume_5m} | <b>1h:</b> ${volume_1h} | <b>24h:</b> ${volume_24h}\n"
+    "\n"
+    "<b>📈 % Change: 1h:</b> {change_1h} | <b>6h:</b> {change_6h} | <b>24h:</b> {change_24h}\n"
+    "\n"
+    "<a href='https://t.me/share/url?url={contract_address}'><code>{contract_address}</code></a>"
+    "\n"
+    "\n"
+    "<a href='{chart_url}'><b>Dexscreener</b></a> | "
+    "<a href='{dextools_url}'><b>DexTools</b></a> | "
+    "<a href='{solscan_url}'><b>Solscan</b></a>\n"
+)
 
-def is_valid_base58(address: str) -> bool:
-    if len(address) in range(32, 45):
-        try:
-            base58.b58decode(address)
-            return True
-        except ValueError:
-            return False
-    return False
+# Token card sent for Pump.fun results when Dexscreener has no pairs yet
+PUMPFUN_MESSAGE_TEMPLATE = (
+    "<b>{name}</b> | <b>${symbol}</b>\n\n"
+    "📝<b>Description:</b> {description}\n"
+    "💰<b>MC (USD):</b> ${market_cap}\n\n"
+    "🌐<b>Socials:</b> {socials}\n\n"
+    "<code>{mint}</code>\n"
+    "\n"
+    "<a href='https://pump.fun/{contract_address}'><b>Pump.fun</b></a>\n"
+)
+
+# Same replacements as html.escape; quotes are included because escaped values land in href='...'
+HTML_ESCAPE_TABLE = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#x27;'})
+
+PRICE_CHANGE_EMOJI = ("🔴", "", "🟢")
+
+# Thresholds and suffixes used by format_number, largest first
+NUMBER_SCALES = ((1_000_000_000, 'B'), (1_000_000, 'M'), (1_000, 'K'))
+
+# Maximum number of API requests in flight at once, to stay under Dexscreener rate limits
+MAX_CONCURRENT_API_REQUESTS = 8
+
+# Attempts per API request, and the responses worth retrying with exponential backoff
+MAX_API_ATTEMPTS = 4
+MAX_RETRY_DELAY = 30.0
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
 
-def is_ethereum_address(address: str) -> bool:
-    return len(address) == 42 and address.startswith("0x")
+# Minimum number of seconds between replies in the same chat, to avoid Telegram flood waits
+CHAT_REPLY_INTERVAL = 1.0
 
-def is_contract_address(address: str) -> bool:
-    return is_valid_base58(address) or is_ethereum_address(address)
+# Name of the repeating job that checks tracked contracts; it only runs while something is tracked
+TRACKER_JOB_NAME = "tracker"
+TRACKER_INTERVAL_SECONDS = 30
+
+# SQLite file that keeps tracked contracts across restarts
+TRACKED_DB_PATH = os.getenv('TRACKED_DB_PATH', 'tracked.db')
+
+# Seconds a cached Dexscreener response stays fresh; tracked contracts are re-fetched on every
+# tracker poll, so their entries can live until the next one
+TOKEN_CACHE_TTL = 5
+TRACKED_TOKEN_CACHE_TTL = 25
+
+# callback_data prefixes of the card buttons; the contract address follows the prefix
+REFRESH_CALLBACK_PREFIX = "refresh_"
+TOGGLE_CALLBACK_PREFIX = "toggle_"
+
+# Seconds the Refresh button must be left alone before the refresh actually runs
+REFRESH_DEBOUNCE_SECONDS = 1.5
+
+# Seconds a card's market cap may be reused as the baseline when its Track button is pressed
+LAST_SEEN_FDV_TTL = 60
+
+# Shared HTTP client so lookups reuse pooled keep-alive connections; created in post_init
+http_client: httpx.AsyncClient = None
+
+# Recent Dexscreener responses, keyed by contract address
+token_cache = TLRUCache(
+    maxsize=2048,
+    ttu=lambda contract_address, data, now: now + (
+        TRACKED_TOKEN_CACHE_TTL if contract_address in tracked_contracts else TOKEN_CACHE_TTL
+    ),
+)
+
+# Requests currently in flight, keyed by URL, so concurrent callers share one response
+inflight_requests: dict[str, asyncio.Future] = {}
+
+api_semaphore = asyncio.Semaphore(MAX_CONCURRENT_API_REQUESTS)
+
+# Ids of each chat's owner and administrators, refreshed at most once a minute
+chat_admins = TTLCache(maxsize=1024, ttl=60)
+
+# Market cap shown on the most recent card for each contract address
+last_seen_fdv = TTLCache(maxsize=4096, ttl=LAST_SEEN_FDV_TTL)
+
+# Pending Telegram work per chat, drained in order by one worker task per chat
+chat_queues: dict[int, asyncio.Queue] = {}
+chat_workers: dict[int, asyncio.Task] = {}
+
+@dataclass(slots=True)
+class TrackedContract:
+    initial_market_cap: float
+    last_alerted_cap: float
+    pin_message_id: int
+    chat_id: int
+
+# Dictionary to store tracked contracts and their initial market caps; only contracts
+# that are currently tracked have an entry, so reads never create one
+tracked_contracts: dict[str, TrackedContract] = {}
+
+# Write-through copy of tracked_contracts; opened in post_init
+tracked_db: sqlite3.Connection = None
+
+def open_tracked_db(path: str) -> sqlite3.Connection:
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS tracked ("
+        "address TEXT PRIMARY KEY, initial_cap REAL, last_cap REAL, pin_id INTEGER, chat_id INTEGER)"
+    )
+    return connection
+
+def load_tracked_contracts() -> None:
+    for address, initial_cap, last_cap, pin_id, chat_id in tracked_db.execute("SELECT * FROM tracked"):
+        tracked_contracts[address] = TrackedContract(initial_cap, last_cap, pin_id, chat_id)
+
+def save_tracked_contract(contract_address: str, data: TrackedContract) -> None:
+    with tracked_db:
+        tracked_db.execute(
+            "INSERT OR REPLACE INTO tracked VALUES (?, ?, ?, ?, ?)",
+            (contract_address, data.initial_market_cap, data.last_alerted_cap, data.pin_message_id, data.chat_id)
+        )
+
+def delete_tracked_contract(contract_address: str) -> None:
+    with tracked_db:
+        tracked_db.execute("DELETE FROM tracked WHERE address = ?", (contract_address,))
+
+def is_valid_base58(address: str) -> bool:
+    # Length and alphabet are all a Solana address needs; the decoded bytes are never used
+    return SOLANA_ADDRESS_RE.match(address) is not None
+
+def retry_delay(attempt: int, retry_after: str = None) -> float:
+    # Honour a Retry-After given in seconds, otherwise back off exponentially with jitter
+    if retry_after and retry_after.isdigit():
+        return min(float(retry_after), MAX_RETRY_DELAY)
+    return min(2 ** attempt, MAX_RETRY_DELAY) + random.random()
 
 async def fetch_data(url: str, headers: dict = None) -> dict:
-    async with httpx.AsyncClient() as client:
+    for attempt in range(MAX_API_ATTEMPTS):
+        retry_after = None
         try:
-            response = await client.get(url, headers=headers)
-            response.raise_for_status()
-            return response.json()
-        except (httpx.RequestError, httpx.HTTPStatusError) as e:
+            async with api_semaphore:
+                response = await http_client.get(url, headers=headers)
+        except httpx.RequestError as e:
             logger.error(f"Error fetching data from {url}: {e}")
+        else:
+            if response.status_code < 400:
+                try:
+                    return orjson.loads(response.content)
+                except orjson.JSONDecodeError as e:
+                    logger.error(f"Invalid JSON from {url}: {e}")
+                    return None
+            logger.error(f"Error fetching data from {url}: HTTP {response.status_code}")
+            if response.status_code not in RETRYABLE_STATUS_CODES:
+                return None
+            retry_after = response.headers.get('retry-after')
+
+        # Sleep outside the semaphore so waiting retries do not hold up other requests
+        if attempt + 1 < MAX_API_ATTEMPTS:
+            await asyncio.sleep(retry_delay(attempt, retry_after))
+    return None
+
+async def fetch_data_shared(url: str) -> dict:
+    # Join a request that is already running for this URL instead of issuing another
+    pending = inflight_requests.get(url)
+    if pending is not None:
+        # Shield the shared future so a cancelled joiner does not cancel it for everyone else
+        return await asyncio.shield(pending)
+
+    future = asyncio.get_running_loop().create_future()
+    inflight_requests[url] = future
+    try:
+        data = await fetch_data(url)
+        if not future.done():
+            future.set_result(data)
+        return data
+    finally:
+        del inflight_requests[url]
+        if not future.done():
+            future.set_result(None)
+
+async def get_dexscreener_token_info(contract_address: str, force: bool = False) -> dict:
+    # force skips the cached copy when stale prices are not acceptable, but still refreshes it
+    cached = None if force else token_cache.get(contract_address)
+    if cached is not None:
+        return cached
+
+    data = await fetch_data_shared(f"{DEXSCREENER_API_URL}{contract_address}")
+    if data is None:
         return None
-
-async def get_dexscreener_token_info(contract_address: str) -> dict:
-    url = f"{DEXSCREENER_API_URL}{contract_address}"
-    return await fetch_data(url)
+    # Cache the filtered view too, so a miss is remembered for the TTL like any other answer
+    info = base_token_pairs([data], [contract_address]).get(contract_address) or {"pairs": []}
+    token_cache[contract_address] = info
+    return info
+
+def address_key(address: str) -> str:
+    # EVM addresses are case-insensitive (Dexscreener returns them checksummed), base58 ones are not
+    return address.lower() if address.startswith("0x") else address
+
+def base_token_pairs(responses: list, contract_addresses: list) -> dict:
+    # The tokens endpoint also returns pairs where the address is only the quote token; keep just
+    # the pairs each contract is the base token of, so cards and the tracker read the same token
+    pairs_by_address = defaultdict(list)
+    for response in responses:
+        for pair in (response or {}).get('pairs') or []:
+            base_address = (pair.get('baseToken') or {}).get('address')
+            if base_address:
+                pairs_by_address[address_key(base_address)].append(pair)
+
+    token_infos = {}
+    for contract_address in contract_addresses:
+        pairs = pairs_by_address.get(address_key(contract_address))
+        if pairs:
+            token_infos[contract_address] = {"pairs": pairs}
+    return token_infos
+
+async def get_dexscreener_tokens_bulk(contract_addresses: list) -> dict:
+    chunks = [
+        contract_addresses[i:i + DEXSCREENER_BATCH_SIZE]
+        for i in range(0, len(contract_addresses), DEXSCREENER_BATCH_SIZE)
+    ]
+    responses = await asyncio.gather(
+        *[fetch_data(f"{DEXSCREENER_API_URL}{','.join(chunk)}") for chunk in chunks]
+    )
+
+    token_infos = base_token_pairs(responses, contract_addresses)
+    # Fresh data, so the card re-rendered after an alert can skip its own lookup
+    token_cache.update(token_infos)
+    return token_infos
 
 async def get_pumpfun_token_info(contract_address: str) -> dict:
     url = f"{PUMPFUN_API_URL}{contract_address}"
-    return await fetch_data(url)
+    return await fetch_data_shared(url)
 
 def format_price_change(change: float) -> str:
-    return f"🟢{change:.2f}%" if change > 0 else f"🔴{change:.2f}%" if change < 0 else f"{change:.2f}%"
+    # Index by the sign of the change: -1 -> red, 0 -> none, 1 -> green
+    return f"{PRICE_CHANGE_EMOJI[(change > 0) - (change < 0) + 1]}{change:.2f}%"
 
 def format_number(number, is_buy_sell=False) -> str:
-    try:
-        number = float(number)
-        if is_buy_sell and number < 1000:
-            return f"{int(number)}"
-        elif number >= 1_000_000_000:
-            return f"{number / 1_000_000_000:.2f}B"
-        elif number >= 1_000_000:
-            return f"{number / 1_000_000:.2f}M"
-        elif number >= 1_000:
-            return f"{number / 1_000:.2f}K"
-        else:
-            return f"{number:.2f}"
-    except (ValueError, TypeError):
+    if number is None:
         return 'N/A'
-
-def calculate_age(pair_created_at: int) -> str:
+    # JSON numbers already arrive as int/float; only strings need parsing
+    if not isinstance(number, (int, float)):
+        try:
+            number = float(number)
+        except (ValueError, TypeError):
+            return 'N/A'
+    if is_buy_sell and number < 1000:
+        return f"{int(number)}"
+    for scale, suffix in NUMBER_SCALES:
+        if number >= scale:
+            return f"{number / scale:.2f}{suffix}"
+    return f"{number:.2f}"
+
+@dataclass(slots=True)
+class PairView:
+    # Numeric pair fields parsed once, next to the formatted strings the token card shows
+    fdv: float
+    market_cap: str
+    liquidity: str
+    volume_5m: str
+    volume_1h: str
+    volume_24h: str
+    price_change_1h: float
+    price_change_6h: float
+    price_change_24h: float
+
+def to_float(value, default: float = None) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+def extract_pair(info: dict) -> PairView:
+    volume = info.get('volume') or {}
+    market_data = info.get('priceChange') or {}
+    fdv = to_float(info.get('fdv'))
+    return PairView(
+        fdv=fdv,
+        market_cap=format_number(fdv),
+        liquidity=format_number((info.get('liquidity') or {}).get('usd')),
+        volume_5m=format_number(volume.get('m5')),
+        volume_1h=format_number(volume.get('h1')),
+        volume_24h=format_number(volume.get('h24')),
+        price_change_1h=to_float(market_data.get('h1'), 0.0),
+        price_change_6h=to_float(market_data.get('h6'), 0.0),
+        price_change_24h=to_float(market_data.get('h24'), 0.0),
+    )
+
+def calculate_age(pair_created_at: int, now: float) -> str:
+    # now is a time.time() reading taken once by the caller; the text has minute resolution,
+    # so it is cached per whole minute of age and shared by every pair that old
     if pair_created_at:
-        creation_date = datetime.fromtimestamp(pair_created_at / 1000, tz=timezone.utc)
-        age = datetime.now(tz=timezone.utc) - creation_date
-        if age.days > 365:
-            years = age.days // 365
-            months = (age.days % 365) // 30
-            return f"{years} year(s), {months} month(s)"
-        elif age.days > 30:
-            months = age.days // 30
-            days = age.days % 30
-            return f"{months} month(s), {days} day(s)"
-        elif age.days > 0:
-            return f"{age.days} day(s)"
-        else:
-            hours, remainder = divmod(age.seconds, 3600)
-            minutes, _ = divmod(remainder, 60)
-            return f"{hours} hour(s), {minutes} minute(s)"
+        return age_for_minutes(int(now - pair_created_at / 1000) // 60)
     return 'N/A'
 
+@lru_cache(maxsize=2048)
+def age_for_minutes(age_minutes: int) -> str:
+    days, seconds = divmod(age_minutes * 60, 86400)
+    if days > 365:
+        return f"{days // 365} year(s), {days % 365 // 30} month(s)"
+    elif days > 30:
+        return f"{days // 30} month(s), {days % 30} day(s)"
+    elif days > 0:
+        return f"{days} day(s)"
+    else:
+        return f"{seconds // 3600} hour(s), {seconds % 3600 // 60} minute(s)"
+
+@lru_cache(maxsize=4096)
 def safe_html_escape(s: str) -> str:
-    return html.escape(s or 'N/A')
+    # Names, symbols and 'N/A' repeat across cards and tracker re-renders
+    return (s or 'N/A').translate(HTML_ESCAPE_TABLE)
+
+@lru_cache(maxsize=64)
+def format_chain(chain_id: str) -> tuple:
+    # Only a handful of chain ids exist, so the display name and URL slug are computed once each
+    chain_slug = safe_html_escape(chain_id.lower())
+    return chain_slug.capitalize(), chain_slug
+
+@lru_cache(maxsize=4096)
+def build_keyboard(contract_address: str, tracked: bool) -> InlineKeyboardMarkup:
+    # A contract only ever has two keyboards, so cards and toggles reuse the same markup objects
+    track_button_label = "✅ Track" if tracked else "❌ Track"
+    return InlineKeyboardMarkup(
+        [
+            [InlineKeyboardButton("Refresh Data", callback_data=REFRESH_CALLBACK_PREFIX + contract_address),
+             InlineKeyboardButton(track_button_label, callback_data=TOGGLE_CALLBACK_PREFIX + contract_address)]
+        ]
+    )
+
+@lru_cache(maxsize=2048)
+def token_static_fields(contract_address: str, chain_id: str, name: str, symbol: str) -> dict:
+    # Name, symbol, chain and the explorer links never change for a token, so tracked tokens
+    # re-rendered every tick reuse them instead of escaping and formatting them again.
+    # Callers must copy the result rather than mutate it.
+    chain_name, chain_slug = format_chain(chain_id)
+    return {
+        "chain_name": chain_name,
+        "name": safe_html_escape(name),
+        "symbol": safe_html_escape(symbol),
+        "contract_address": contract_address,
+        "dextools_url": DEXTOOLS_URL_TEMPLATE.format(chain_slug=chain_slug, contract_address=contract_address),
+        "solscan_url": SOLSCAN_URL_TEMPLATE.format(contract_address=contract_address),
+    }
+
+def extract_dex_fields(info: dict, contract_address: str) -> dict:
+    # Walk the pair once and return the escaped, formatted values DEXSCREENER_MESSAGE_TEMPLATE expects
+    base_token = info.get('baseToken') or {}
+    static_fields = token_static_fields(
+        contract_address, info.get('chainId') or 'N/A', base_token.get('name', 'N/A'), base_token.get('symbol', 'N/A')
+    )
+    pair = extract_pair(info)
+
+    txns = info.get('txns') or {}
+    txns_5m = txns.get('m5') or {}
+    txns_1h = txns.get('h1') or {}
+    txns_24h = txns.get('h24') or {}
+
+    # format_number only emits digits, '.', a K/M/B suffix or N/A, so its output needs no escaping
+    return {
+        **static_fields,
+        "price": safe_html_escape(str(info.get('priceUsd', 'N/A'))),
+        "market_cap": pair.market_cap,
+        "liquidity": pair.liquidity,
+        "age": safe_html_escape(calculate_age(info.get('pairCreatedAt', 0), time.time())),
+        "buys_5m": format_number(txns_5m.get('buys'), is_buy_sell=True),
+        "sells_5m": format_number(txns_5m.get('sells'), is_buy_sell=True),
+        "buys_1h": format_number(txns_1h.get('buys'), is_buy_sell=True),
+        "sells_1h": format_number(txns_1h.get('sells'), is_buy_sell=True),
+        "buys_24h": format_number(txns_24h.get('buys'), is_buy_sell=True),
+        "sells_24h": format_number(txns_24h.get('sells'), is_buy_sell=True),
+        "volume_5m": pair.volume_5m,
+        "volume_1h": pair.volume_1h,
+        "volume_24h": pair.volume_24h,
+        "change_1h": format_price_change(pair.price_change_1h),
+        "change_6h": format_price_change(pair.price_change_6h),
+        "change_24h": format_price_change(pair.price_change_24h),
+        "chart_url": safe_html_escape(info.get('url', '')),
+    }
+
+async def get_chat_admin_ids(context: ContextTypes.DEFAULT_TYPE, chat_id: int) -> frozenset:
+    admin_ids = chat_admins.get(chat_id)
+    if admin_ids is None:
+        try:
+            administrators = await context.bot.get_chat_administrators(chat_id)
+            admin_ids = frozenset(member.user.id for member in administrators)
+        except BadRequest:
+            # Private chats have no administrators
+            admin_ids = frozenset()
+        chat_admins[chat_id] = admin_ids
+    return admin_ids
 
 async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    # The handler's filter only lets through messages that are a contract address
     if update.message and update.message.text:
-        message_text = update.message.text.strip()
-
-        # Check if the message contains a valid contract address
-        if not is_contract_address(message_text):
-            return  # Ignore the message if it doesn't contain a valid contract address
-        
-        await send_token_info(update=update, context=context, contract_address=message_text)
+        contract_address = update.message.text.strip()
+        await send_token_info(update=update, context=context, contract_address=contract_address)
+
+async def send_token_info(update: Update, context: ContextTypes.DEFAULT_TYPE, contract_address: str, is_refresh=False, chat_id=None, message_id=None, force=False) -> None:
+    if is_refresh or not is_valid_base58(contract_address):
+        # Refreshed cards are always Dexscreener cards, and Pump.fun only knows Solana mints
+        info_data = await get_dexscreener_token_info(contract_address, force=force)
+        pumpfun_task = None
+    else:
+        # Start the Pump.fun lookup alongside Dexscreener so the fallback costs no extra round trip
+        pumpfun_task = asyncio.ensure_future(get_pumpfun_token_info(contract_address))
+        try:
+            info_data = await get_dexscreener_token_info(contract_address, force=force)
+        except BaseException:
+            pumpfun_task.cancel()
+            raise
 
-async def send_token_info(update: Update, context: ContextTypes.DEFAULT_TYPE, contract_address: str, is_refresh=False, chat_id=None, message_id=None) -> None:
-    info_data = await get_dexscreener_token_info(contract_address)
-    
     if info_data and 'pairs' in info_data and info_data['pairs']:
         info = info_data['pairs'][0]
-        chain_name = safe_html_escape(info.get('chainId', 'N/A').capitalize())
-        base_token = info.get('baseToken', {})
-        quote_token = info.get('quoteToken', {})
-        market_data = info.get('priceChange', {})
-        liquidity = info.get('liquidity', {})
-        volume_5m = format_number(info.get('volume', {}).get('m5', 'N/A'))
-        volume_1h = format_number(info.get('volume', {}).get('h1', 'N/A'))
-        volume_24h = format_number(info.get('volume', {}).get('h24', 'N/A'))
-        fdv = format_number(info.get('fdv', 'N/A'))
-        txns = info.get('txns', {})
-        pair_created_at = info.get('pairCreatedAt', 0)
-        chart_url = safe_html_escape(info.get('url', ''))
-
-        buys_5m = safe_html_escape(format_number(txns.get('m5', {}).get('buys', 'N/A'), is_buy_sell=True))
-        sells_5m = safe_html_escape(format_number(txns.get('m5', {}).get('sells', 'N/A'), is_buy_sell=True))
-        buys_1h = safe_html_escape(format_number(txns.get('h1', {}).get('buys', 'N/A'), is_buy_sell=True))
-        sells_1h = safe_html_escape(format_number(txns.get('h1', {}).get('sells', 'N/A'), is_buy_sell=True))
-        buys_24h = safe_html_escape(format_number(txns.get('h24', {}).get('buys', 'N/A'), is_buy_sell=True))
-        sells_24h = safe_html_escape(format_number(txns.get('h24', {}).get('sells', 'N/A'), is_buy_sell=True))
-
-        token_symbol = safe_html_escape(base_token.get('symbol', 'N/A'))
-        
-        price_change_1h = market_data.get('h1', 0.0)
-        price_change_6h = market_data.get('h6', 0.0)
-        price_change_24h = market_data.get('h24', 0.0)
-        
-        pair_age = safe_html_escape(calculate_age(pair_created_at))
-
-        dextools_url = f"https://www.dextools.io/app/{chain_name.lower()}/pair-explorer/{contract_address}"
-        solscan_url = f"https://solscan.io/token/{contract_address}"
-
-        response_message = (
-            f"<b>Network:</b> {chain_name}\n"
-            f"\n"
-            f"<b>{safe_html_escape(base_token.get('name', 'N/A'))}</b> | <b>${token_symbol}</b>\n\n"
-            f"<b>💲 Price (USD):</b> ${safe_html_escape(str(info.get('priceUsd', 'N/A')))}\n"
-            f"<b>💰 MC (USD):</b> ${fdv}\n"
-            f"<b>💧 Liq (USD):</b> ${format_number(liquidity.get('usd'))}\n"
-            f"<b>🕒 Age:</b> {pair_age}\n"
-            f"\n"
-            f"<b>🔄 B/S: 5m:</b> {buys_5m}/{sells_5m} | <b>1h:</b> {buys_1h}/{sells_1h} | <b>24h:</b> {buys_24h}/{sells_24h}\n"
-            f"<b>📊 Volume (USD): 5m:</b> ${volume_5m} | <b>1h:</b> ${volume_1h} | <b>24h:</b> ${volume_24h}\n"
-            f"\n"
-            f"<b>📈 % Change: 1h:</b> {format_price_change(price_change_1h)} | <b>6h:</b> {format_price_change(price_change_6h)} | <b>24h:</b> {format_price_change(price_change_24h)}\n"
-            f"\n"
-            f"<a href='https://t.me/share/url?url={contract_address}'><code>{contract_address}</code></a>"
-            f"\n"
-            f"\n"
-            f"<a href='{chart_url}'><b>Dexscreener</b></a> | "
-            f"<a href='{dextools_url}'><b>DexTools</b></a> | "
-            f"<a href='{solscan_url}'><b>Solscan</b></a>\n"
-        )
-        # Create the inline keyboard
-        track_button_label = "✅ Track" if tracked_contracts[contract_address]["initial_market_cap"] else "❌ Track"
-        keyboard = InlineKeyboardMarkup(
-            [
-                [InlineKeyboardButton("Refresh Data", callback_data=f"refresh_{contract_address}"),
-                 InlineKeyboardButton(track_button_label, callback_data=f"toggle_{contract_address}")]
-            ]
-        )
+        response_message = DEXSCREENER_MESSAGE_TEMPLATE.format_map(extract_dex_fields(info, contract_address))
+        fdv = to_float(info.get('fdv'))
+        if fdv is not None:
+            last_seen_fdv[contract_address] = fdv
 
-        if is_refresh:
-            await context.bot.edit_message_text(
-                chat_id=chat_id, message_id=message_id, text="Refreshing data...",
-                parse_mode=ParseMode.HTML
-            )
-            await asyncio.sleep(2)
-            await context.bot.delete_message(chat_id=chat_id, message_id=message_id)
-            sent_message = await context.bot.send_message(
-                chat_id=chat_id, text=response_message, parse_mode=ParseMode.HTML,
-                disable_web_page_preview=True, reply_markup=keyboard
-            )
+        keyboard = build_keyboard(contract_address, contract_address in tracked_contracts)
 
-            # Re-pin the message if the contract is being tracked
-            if tracked_contracts[contract_address]["initial_market_cap"] is not None:
-                await context.bot.pin_chat_message(chat_id=chat_id, message_id=sent_message.message_id)
-                tracked_contracts[contract_address]["pin_message_id"] = sent_message.message_id
+        if pumpfun_task is not None:
+            pumpfun_task.cancel()
 
-            return sent_message.message_id, chat_id
+        if is_refresh:
+            # Edit in place so the message keeps its id and stays pinned if it is being tracked
+            try:
+                await context.bot.edit_message_text(
+                    chat_id=chat_id, message_id=message_id, text=response_message,
+                    parse_mode=ParseMode.HTML, disable_web_page_preview=True, reply_markup=keyboard
+                )
+            except BadRequest as e:
+                # Telegram rejects edits that leave the message unchanged
+                if "not modified" not in str(e):
+                    raise
+            return message_id, chat_id
         else:
-            sent_message = await update.message.reply_text(response_message, parse_mode=ParseMode.HTML, disable_web_page_preview=True, reply_markup=keyboard)
-            return sent_message.message_id, update.message.chat_id
+            enqueue_reply(update, response_message, reply_markup=keyboard)
+    elif is_refresh:
+        # Leave the card as it is rather than replacing it with an error
+        return message_id, chat_id
     else:
-        # Try to fetch data from Pump.fun API
-        pumpfun_data = await get_pumpfun_token_info(contract_address)
+        # Fall back to the Pump.fun lookup started above
+        pumpfun_data = await pumpfun_task if pumpfun_task is not None else None
         if pumpfun_data:
             name = safe_html_escape(pumpfun_data.get('name', 'N/A'))
             mint = safe_html_escape(pumpfun_data.get('mint', 'N/A'))
@@ -211,7 +519,6 @@ async def send_token_info(update: Update, context: ContextTypes.DEFAULT_TYPE, co
             telegram = safe_html_escape(pumpfun_data.get('telegram', 'N/A'))
             website = safe_html_escape(pumpfun_data.get('website', '') or 'N/A')
             market_cap = format_number(pumpfun_data.get('usd_market_cap', 'N/A'))
-            pumpfun_url = f"https://pump.fun/{contract_address}"
 
             social_links = []
             if twitter != 'N/A':
@@ -222,119 +529,211 @@ async def send_token_info(update: Update, context: ContextTypes.DEFAULT_TYPE, co
                 social_links.append(f"<a href='{website}'>Website</a>")
             social_links_str = " | ".join(social_links)
 
-            response_message = (
-                f"<b>{name}</b> | <b>${symbol}</b>\n\n"
-                f"📝<b>Description:</b> {description}\n"
-                f"💰<b>MC (USD):</b> ${market_cap}\n\n"
-                f"🌐<b>Socials:</b> {social_links_str}\n\n"
-                f"<code>{mint}</code>\n"
-                f"\n"
-                f"<a href='{pumpfun_url}'><b>Pump.fun</b></a>\n"
-            )
-
-            await update.message.reply_text(response_message, parse_mode=ParseMode.HTML, disable_web_page_preview=True)
+            response_message = PUMPFUN_MESSAGE_TEMPLATE.format_map({
+                "name": name,
+                "symbol": symbol,
+                "description": description,
+                "market_cap": market_cap,
+                "socials": social_links_str,
+                "mint": mint,
+                "contract_address": contract_address,
+            })
+
+            enqueue_reply(update, response_message)
         else:
-            response_message = "Unknown contract address or unavailable at this time."
-            await update.message.reply_text(response_message, parse_mode=ParseMode.HTML, disable_web_page_preview=True)
+            enqueue_reply(update, "Unknown contract address or unavailable at this time.")
 
 async def refresh_data(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     query = update.callback_query
     await query.answer()
-    contract_address = query.data.split('_')[1]
+    contract_address = query.data[len(REFRESH_CALLBACK_PREFIX):]
+    chat_id = query.message.chat_id
+
+    # Restart the debounce timer so repeated taps collapse into a single refresh
+    job_name = f"refresh_{chat_id}_{contract_address}"
+    for job in context.job_queue.get_jobs_by_name(job_name):
+        job.schedule_removal()
+    context.job_queue.run_once(
+        run_refresh, REFRESH_DEBOUNCE_SECONDS,
+        data=(contract_address, query.message.message_id), chat_id=chat_id, name=job_name
+    )
+
+async def run_refresh(context: ContextTypes.DEFAULT_TYPE) -> None:
+    contract_address, message_id = context.job.data
+    # An explicit refresh always shows live data rather than a cached copy
+    await send_token_info(update=None, context=context, contract_address=contract_address, is_refresh=True, chat_id=context.job.chat_id, message_id=message_id, force=True)
 
-    # Refresh the data and delete the old message
-    await send_token_info(update=query, context=context, contract_address=contract_address, is_refresh=True, chat_id=query.message.chat_id, message_id=query.message.message_id)
+async def delete_message_job(context: ContextTypes.DEFAULT_TYPE) -> None:
+    await context.bot.delete_message(chat_id=context.job.chat_id, message_id=context.job.data)
+
+def delete_message_later(context: ContextTypes.DEFAULT_TYPE, message, delay: float) -> None:
+    # Let the job queue remove the notice so the handler does not sit in a sleep
+    context.job_queue.run_once(delete_message_job, delay, data=message.message_id, chat_id=message.chat_id)
 
 async def toggle_tracking(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     query = update.callback_query
     await query.answer()
-    contract_address = query.data.split('_')[1]
+    contract_address = query.data[len(TOGGLE_CALLBACK_PREFIX):]
 
     user_id = query.from_user.id
     chat_id = query.message.chat_id
 
-    member = await context.bot.get_chat_member(chat_id, user_id)
-    if member.status not in [ChatMember.ADMINISTRATOR, ChatMember.OWNER]:
+    if user_id not in await get_chat_admin_ids(context, chat_id):
         no_permission_message = await context.bot.send_message(
             chat_id=query.message.chat_id,
             text="You do not have permission to add to the Track List.",
             parse_mode=ParseMode.HTML
         )
-        await asyncio.sleep(10)
-        await context.bot.delete_message(chat_id=no_permission_message.chat_id, message_id=no_permission_message.message_id)
+        delete_message_later(context, no_permission_message, 10)
         return
 
-    if tracked_contracts[contract_address]["initial_market_cap"] is None:
-        info_data = await get_dexscreener_token_info(contract_address)
-        if info_data and 'pairs' in info_data and info_data['pairs']:
-            market_cap = float(info_data['pairs'][0].get('fdv', 0))
-            tracked_contracts[contract_address]["initial_market_cap"] = market_cap
-            tracked_contracts[contract_address]["last_alerted_cap"] = market_cap
-            tracked_contracts[contract_address]["pin_message_id"] = query.message.message_id
-            tracked_contracts[contract_address]["chat_id"] = query.message.chat_id
-            await context.bot.pin_chat_message(chat_id=query.message.chat_id, message_id=query.message.message_id)
-            await query.edit_message_reply_markup(
-                reply_markup=InlineKeyboardMarkup(
-                    [
-                        [InlineKeyboardButton("Refresh Data", callback_data=f"refresh_{contract_address}"),
-                         InlineKeyboardButton("✅ Track", callback_data=f"toggle_{contract_address}")]
-                    ]
-                )
+    if contract_address not in tracked_contracts:
+        # Alerts are measured from this market cap; the card being tapped was rendered moments ago,
+        # so reuse its value and only go to the API when it has expired
+        market_cap = last_seen_fdv.get(contract_address)
+        if market_cap is None:
+            info_data = await get_dexscreener_token_info(contract_address, force=True)
+            if info_data and 'pairs' in info_data and info_data['pairs']:
+                market_cap = extract_pair(info_data['pairs'][0]).fdv or 0.0
+        if market_cap is not None:
+            tracked_contracts[contract_address] = TrackedContract(
+                initial_market_cap=market_cap,
+                last_alerted_cap=market_cap,
+                pin_message_id=query.message.message_id,
+                chat_id=query.message.chat_id,
             )
+            save_tracked_contract(contract_address, tracked_contracts[contract_address])
+            start_tracker(context.job_queue)
+            await context.bot.pin_chat_message(chat_id=query.message.chat_id, message_id=query.message.message_id)
+            await query.edit_message_reply_markup(reply_markup=build_keyboard(contract_address, True))
     else:
-        pin_message_id = tracked_contracts[contract_address]["pin_message_id"]
-        chat_id = tracked_contracts[contract_address]["chat_id"]
-        tracked_contracts[contract_address] = {"initial_market_cap": None, "last_alerted_cap": None, "pin_message_id": None, "chat_id": None}
+        data = tracked_contracts.pop(contract_address)
+        delete_tracked_contract(contract_address)
+        stop_tracker_if_idle(context.job_queue)
+        pin_message_id = data.pin_message_id
+        chat_id = data.chat_id
         await context.bot.unpin_chat_message(chat_id=chat_id, message_id=pin_message_id)
         stop_message = await context.bot.send_message(
             chat_id=query.message.chat_id,
             text=f"Stopped tracking {contract_address}.",
             parse_mode=ParseMode.HTML
         )
-        await asyncio.sleep(5)
-        await context.bot.delete_message(chat_id=stop_message.chat_id, message_id=stop_message.message_id)
-        await query.edit_message_reply_markup(
-            reply_markup=InlineKeyboardMarkup(
-                [
-                    [InlineKeyboardButton("Refresh Data", callback_data=f"refresh_{contract_address}"),
-                     InlineKeyboardButton("❌ Track", callback_data=f"toggle_{contract_address}")]
-                ]
-            )
-        )
+        delete_message_later(context, stop_message, 5)
+        await query.edit_message_reply_markup(reply_markup=build_keyboard(contract_address, False))
+
+async def send_market_cap_alert(context: ContextTypes.DEFAULT_TYPE, contract_address: str, chat_id: int, pin_message_id: int, direction: str, percentage_change: float) -> None:
+    message = (
+        f"Market Cap Alert for <a href='https://t.me/share/url?url={contract_address}'>{contract_address}</a>: "
+        f"{direction} by {percentage_change:.2f}%"
+    )
+    await context.bot.send_message(chat_id=chat_id, text=message, parse_mode=ParseMode.HTML)
+
+    # The pinned card is edited in place, so it keeps its id and stays pinned
+    await send_token_info(update=None, context=context, contract_address=contract_address, is_refresh=True, chat_id=chat_id, message_id=pin_message_id)
+
+async def run_chat_queue(chat_id: int, queue: asyncio.Queue) -> None:
+    try:
+        while not queue.empty():
+            work = queue.get_nowait()
+            try:
+                await work()
+            except Exception:
+                logger.exception(f"Error processing queued work for chat {chat_id}:")
+            # Space out messages to the chat to stay clear of Telegram's flood limits; the worker
+            # lingers for one interval after the last item, so that also spaces work queued next
+            await asyncio.sleep(CHAT_REPLY_INTERVAL)
+    finally:
+        del chat_queues[chat_id]
+        del chat_workers[chat_id]
+
+def enqueue_chat_work(chat_id: int, work) -> None:
+    # Work for one chat runs in order while other chats proceed independently
+    queue = chat_queues.get(chat_id)
+    if queue is None:
+        queue = chat_queues[chat_id] = asyncio.Queue()
+        chat_workers[chat_id] = asyncio.create_task(run_chat_queue(chat_id, queue))
+    queue.put_nowait(work)
+
+def enqueue_reply(update: Update, text: str, **kwargs) -> None:
+    # Throttled replies wait in the chat's queue, not in the handler, so a burst in one chat
+    # does not hold PTB's concurrent update slots while other chats wait
+    enqueue_chat_work(update.message.chat_id, partial(
+        update.message.reply_text, text, parse_mode=ParseMode.HTML, disable_web_page_preview=True, **kwargs
+    ))
 
 async def check_tracked_contracts(context: ContextTypes.DEFAULT_TYPE) -> None:
-    for contract_address, data in tracked_contracts.items():
-        if data["initial_market_cap"] is None:
+    # The job is removed once nothing is tracked, but a tick can already be due when that happens
+    if not tracked_contracts:
+        return
+
+    # Work from copies: toggle_tracking may change or remove entries while the batch is in flight
+    snapshot = [(contract_address, replace(data)) for contract_address, data in tracked_contracts.items()]
+    token_infos = await get_dexscreener_tokens_bulk([contract_address for contract_address, _ in snapshot])
+
+    for contract_address, data in snapshot:
+        info_data = token_infos.get(contract_address)
+        if info_data is None:
             continue
 
-        info_data = await get_dexscreener_token_info(contract_address)
-        if info_data and 'pairs' in info_data and info_data['pairs']:
-            current_market_cap = float(info_data['pairs'][0].get('fdv', 0))
-            initial_market_cap = data["initial_market_cap"]
-            last_alerted_cap = data["last_alerted_cap"]
-
-            # Price action condition changed to 1%
-            if abs(current_market_cap - last_alerted_cap) / last_alerted_cap >= 0.05:
-                direction = "up" if current_market_cap > last_alerted_cap else "down"
-                percentage_change = ((current_market_cap - last_alerted_cap) / last_alerted_cap) * 100
-                message = (
-                    f"Market Cap Alert for <a href='https://t.me/share/url?url={contract_address}'>{contract_address}</a>: "
-                    f"{direction} by {percentage_change:.2f}%"
-                )
-                await context.bot.send_message(chat_id=data["chat_id"], text=message, parse_mode=ParseMode.HTML)
-                tracked_contracts[contract_address]["last_alerted_cap"] = current_market_cap
+        current_market_cap = extract_pair(info_data['pairs'][0]).fdv
+        last_alerted_cap = data.last_alerted_cap
+        # Without both market caps there is no change to measure
+        if current_market_cap is None or not last_alerted_cap:
+            continue
 
-                # Unpin the old message and pin the new message only if the contract is being tracked
-                await context.bot.unpin_chat_message(chat_id=data["chat_id"], message_id=data["pin_message_id"])
-                pin_message_id, chat_id = await send_token_info(update=None, context=context, contract_address=contract_address, is_refresh=True, chat_id=data["chat_id"], message_id=data["pin_message_id"])
-                if pin_message_id:
-                    await context.bot.pin_chat_message(chat_id=chat_id, message_id=pin_message_id)
-                    tracked_contracts[contract_address]["pin_message_id"] = pin_message_id
+        # Price action condition changed to 1%
+        if abs(current_market_cap - last_alerted_cap) / last_alerted_cap >= 0.05:
+            direction = "up" if current_market_cap > last_alerted_cap else "down"
+            percentage_change = ((current_market_cap - last_alerted_cap) / last_alerted_cap) * 100
+            # Skip contracts that were untracked while the batch was being fetched
+            entry = tracked_contracts.get(contract_address)
+            if entry is None:
+                continue
+            entry.last_alerted_cap = current_market_cap
+            save_tracked_contract(contract_address, entry)
+
+            enqueue_chat_work(data.chat_id, partial(send_market_cap_alert, context, contract_address, data.chat_id, data.pin_message_id, direction, percentage_change))
+
+def start_tracker(job_queue, first: float = 5) -> None:
+    if not job_queue.get_jobs_by_name(TRACKER_JOB_NAME):
+        job_queue.run_repeating(check_tracked_contracts, interval=TRACKER_INTERVAL_SECONDS, first=first, name=TRACKER_JOB_NAME)
+
+def stop_tracker_if_idle(job_queue) -> None:
+    if not tracked_contracts:
+        for job in job_queue.get_jobs_by_name(TRACKER_JOB_NAME):
+            job.schedule_removal()
+
+async def post_init(application: Application) -> None:
+    global http_client, tracked_db
+    tracked_db = open_tracked_db(TRACKED_DB_PATH)
+    load_tracked_contracts()
+    logger.info(f"Loaded {len(tracked_contracts)} tracked contract(s) from {TRACKED_DB_PATH}")
+    if tracked_contracts:
+        start_tracker(application.job_queue, first=10)
+
+    http_client = httpx.AsyncClient(
+        http2=True,
+        timeout=httpx.Timeout(10.0, connect=5.0),
+        limits=httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=60.0),
+        headers={"accept": "application/json", "accept-encoding": "br, gzip"},
+    )
+
+async def post_shutdown(application: Application) -> None:
+    for worker in list(chat_workers.values()):
+        worker.cancel()
+    await http_client.aclose()
+    tracked_db.close()
 
 def main() -> None:
     """Start the bot."""
     try:
-        
+        # Use the libuv event loop where it is available (not on Windows)
+        try:
+            import uvloop
+            uvloop.install()
+        except ImportError:
+            pass
+
         token = os.getenv('TELEGRAM_BOT_API_TOKEN')
 
         if not token:
@@ -342,23 +741,39 @@ def main() -> None:
             return
 
         # Create the Application and pass it your bot's token.
-        application = Application.builder().token(token).build()
+        application = (
+            Application.builder()
+            .token(token)
+            .post_init(post_init)
+            .post_shutdown(post_shutdown)
+            # Keep PTB's default 256-connection Bot API pool; it comfortably covers 32 concurrent
+            # updates plus refresh, alert and delete jobs. Only wait longer for a free connection.
+            .pool_timeout(5.0)
+            .concurrent_updates(32)
+            .build()
+        )
 
-        # Handle messages that are contract addresses or mention the bot
-        application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_message))
+        # Handle messages that are contract addresses; everything else is dropped by the filter before dispatch
+        application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND & filters.Regex(CONTRACT_MESSAGE_RE), handle_message))
 
         # callback for refreshing data
-        application.add_handler(CallbackQueryHandler(refresh_data, pattern=r"refresh_"))
+        application.add_handler(CallbackQueryHandler(refresh_data, pattern=f"^{REFRESH_CALLBACK_PREFIX}"))
 
         # callback for tracking data
-        application.add_handler(CallbackQueryHandler(toggle_tracking, pattern=r"toggle_"))
-
-        # Schedule a job to check the tracked contracts periodically
-        job_queue = application.job_queue
-        job_queue.run_repeating(check_tracked_contracts, interval=30, first=10)
-
-        application.run_polling()
-    except Exception as e:
+        application.add_handler(CallbackQueryHandler(toggle_tracking, pattern=f"^{TOGGLE_CALLBACK_PREFIX}"))
+
+        # Receive updates by webhook when a public URL is configured, otherwise fall back to polling
+        webhook_url = os.getenv('WEBHOOK_URL')
+        if webhook_url:
+            application.run_webhook(
+                listen="0.0.0.0",
+                port=int(os.getenv('PORT', 8443)),
+                url_path=token,
+                webhook_url=f"{webhook_url.rstrip('/')}/{token}",
+            )
+        else:
+            application.run_polling()
+    except Exception:
         logger.exception("An error occurred while starting the bot:")
 
 if __name__ == '__main__':